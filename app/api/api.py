@@ -1,6 +1,9 @@
 """
 API router configuration module.
 """
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -8,14 +11,28 @@ from app.core.config import settings
 from app.api.endpoints import routers
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Preload registered workflows in the background during startup.
+    """
+    # Imported here so building the app does not instantiate the registry
+    from app.services.workflow_service import workflow_registry
+
+    threading.Thread(target=workflow_registry.load_all_workflows, daemon=True).start()
+    yield
+
+
 def create_app() -> FastAPI:
     """
     Create and configure the FastAPI application.
     """
+    prefix = settings.API_V1_STR
     app = FastAPI(
         title=settings.PROJECT_NAME,
-        openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        openapi_url=f"{prefix}/openapi.json",
         debug=settings.DEBUG,
+        lifespan=lifespan,
     )
 
     # Set CORS middleware
@@ -27,9 +44,9 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    # Include all routers automatically from the endpoints package
-    for module_name, router in routers.items():
-        app.include_router(router, prefix=settings.API_V1_STR)
-        print(f"Registered router from module: {module_name}")
+    # Include all routers from the endpoints package
+    include = app.include_router
+    for router in routers.values():
+        include(router, prefix=prefix)
 
     return app 
\ No newline at end of file
@@ -1,10 +1,13 @@
 """
 Health check endpoints.
 """
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
 
 router = APIRouter(prefix="/health", tags=["health"])
 
+# Pre-encoded body so health checks skip JSON encoding entirely
+_HEALTHY_BODY = b'{"status":"healthy"}'
+
 
 @router.get(
     "",
@@ -17,6 +20,6 @@ async def health_check():
     Perform a health check on the API.
     
     Returns:
-        dict: A simple response indicating the API is operational.
+        Response: A simple JSON response indicating the API is operational.
     """
-    return {"status": "healthy"} 
\ No newline at end of file
+    return Response(content=_HEALTHY_BODY, media_type="application/json") 
\ No newline at end of file
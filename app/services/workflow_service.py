@@ -5,14 +5,28 @@ import importlib.util
 import json
 import logging
 import os
+import py_compile
+import shutil
 import sys
 import tempfile
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(slots=True)
+class WorkflowEntry:
+    """A loaded workflow module and its entry point."""
+    module: Any
+    run_func: Callable[[Dict[str, Any]], Dict[str, Any]]
+    loaded_at: int  # time.time_ns() at load
+
+
 class WorkflowRegistry:
     """Service for managing and executing workflows."""
     
@@ -20,13 +34,23 @@ class WorkflowRegistry:
         """
         Initialize the workflow service.
         
+        Workflows are not loaded here; call load_all_workflows() to preload
+        them, or let execute_workflow() and get_all_workflows() load them on
+        demand. Each load, registration and deletion holds a reentrant lock so
+        a background preload cannot race request threads; a separate lock only
+        serializes full loads so listing waits for an in-progress preload.
+        
         Args:
             workflows_dir: Directory where workflow modules are stored
         """
         self.workflows_dir = workflows_dir
         self._ensure_workflows_dir()
-        self.workflows = {}
-        self.load_all_workflows()
+        self.workflows: Dict[str, WorkflowEntry] = {}
+        self._metadata_cache: Dict[str, Dict[str, Any]] = {}
+        self._module_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._lock = threading.RLock()
+        self._preload_lock = threading.Lock()
+        self._all_loaded = False
         
     def _ensure_workflows_dir(self):
         """Ensure the workflows directory exists."""
@@ -38,16 +62,31 @@ class WorkflowRegistry:
         
     def load_all_workflows(self):
         """Load all available workflows from the workflows directory."""
+        with self._preload_lock:
+            self._load_all_workflows()
+    
+    def _load_all_workflows(self):
+        """Load every workflow directory, taking the registry lock per workflow."""
         try:
-            workflow_dirs = [d for d in os.listdir(self.workflows_dir) 
-                           if os.path.isdir(os.path.join(self.workflows_dir, d)) 
-                           and not d.startswith("__")]
+            with os.scandir(self.workflows_dir) as entries:
+                workflow_dirs = [e.name for e in entries
+                                 if e.is_dir()
+                                 and not e.name.startswith("__")]
             
             for workflow_dir in workflow_dirs:
                 self.load_workflow(workflow_dir)
+            self._all_loaded = True
         except Exception as e:
             logger.error(f"Error loading workflows: {e}")
     
+    def _ensure_all_loaded(self):
+        """Load all workflows unless a previous full load has completed."""
+        if self._all_loaded:
+            return
+        with self._preload_lock:
+            if not self._all_loaded:
+                self._load_all_workflows()
+    
     def load_workflow(self, workflow_id: str) -> bool:
         """
         Load a specific workflow module.
@@ -58,42 +97,55 @@ class WorkflowRegistry:
         Returns:
             bool: True if workflow was loaded successfully
         """
-        try:
-            workflow_path = os.path.join(self.workflows_dir, workflow_id)
+        with self._lock:
+            try:
+                workflow_path = os.path.join(self.workflows_dir, workflow_id)
             
-            if not os.path.exists(workflow_path):
-                logger.error(f"Workflow directory does not exist: {workflow_path}")
-                return False
+                if not os.path.exists(workflow_path):
+                    logger.error(f"Workflow directory does not exist: {workflow_path}")
+                    return False
             
-            # Attempt to import the module
-            spec = importlib.util.spec_from_file_location(
-                f"workflows.{workflow_id}.main", 
-                os.path.join(workflow_path, "main.py")
-            )
+                main_py = os.path.join(workflow_path, "main.py")
+                stat = os.stat(main_py)
+                source_key = (stat.st_mtime_ns, stat.st_size)
             
-            if spec is None or spec.loader is None:
-                logger.error(f"Could not load workflow module: {workflow_id}")
-                return False
+                # Reuse the module if main.py has not changed since it was executed
+                cached = self._module_cache.get(workflow_id)
+                if cached is not None and cached[0] == source_key:
+                    module = cached[1]
+                else:
+                    # Attempt to import the module
+                    spec = importlib.util.spec_from_file_location(
+                        f"workflows.{workflow_id}.main", 
+                        main_py
+                    )
                 
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # Register the workflow
-            if hasattr(module, "run_graph"):
-                self.workflows[workflow_id] = {
-                    "module": module,
-                    "run_func": module.run_graph,
-                    "loaded_at": datetime.now().isoformat()
-                }
-                logger.info(f"Successfully loaded workflow: {workflow_id}")
-                return True
-            else:
-                logger.error(f"Workflow module does not have run_graph function: {workflow_id}")
-                return False
+                    if spec is None or spec.loader is None:
+                        logger.error(f"Could not load workflow module: {workflow_id}")
+                        return False
+                    
+                    module = importlib.util.module_from_spec(spec)
+                    spec.loader.exec_module(module)
+                    self._module_cache[workflow_id] = (source_key, module)
+            
+                # Register the workflow
+                if hasattr(module, "run_graph"):
+                    self.workflows[workflow_id] = WorkflowEntry(
+                        module=module,
+                        run_func=module.run_graph,
+                        loaded_at=time.time_ns(),
+                    )
+                    if workflow_id not in self._metadata_cache:
+                        self._cache_metadata(workflow_id)
+                    logger.info(f"Successfully loaded workflow: {workflow_id}")
+                    return True
+                else:
+                    logger.error(f"Workflow module does not have run_graph function: {workflow_id}")
+                    return False
                 
-        except Exception as e:
-            logger.error(f"Error loading workflow {workflow_id}: {e}")
-            return False
+            except Exception as e:
+                logger.error(f"Error loading workflow {workflow_id}: {e}")
+                return False
     
     def register_workflow(self, 
                           workflow_id: str, 
@@ -110,36 +162,55 @@ class WorkflowRegistry:
         Returns:
             bool: True if workflow was registered successfully
         """
-        try:
-            # Create workflow directory
-            workflow_dir = os.path.join(self.workflows_dir, workflow_id)
-            os.makedirs(workflow_dir, exist_ok=True)
+        with self._lock:
+            try:
+                workflow_dir = os.path.join(self.workflows_dir, workflow_id)
+                main_py = os.path.join(workflow_dir, "main.py")
+                
+                # Reject invalid source before touching an existing workflow on disk
+                if "main.py" in code_files:
+                    compile(code_files["main.py"], main_py, "exec")
+                
+                # Create workflow directory
+                created = not os.path.exists(workflow_dir)
+                os.makedirs(workflow_dir, exist_ok=True)
+            
+                # Write files
+                for filename, content in code_files.items():
+                    with open(os.path.join(workflow_dir, filename), "w") as f:
+                        f.write(content)
             
-            # Write files
-            for filename, content in code_files.items():
-                with open(os.path.join(workflow_dir, filename), "w") as f:
-                    f.write(content)
+                # Compile main.py up front so later loads read the cached bytecode
+                try:
+                    py_compile.compile(main_py, doraise=True)
+                except Exception:
+                    # Do not leave behind a new directory that fails to load on every startup
+                    if created:
+                        self._forget_workflow(workflow_id)
+                        shutil.rmtree(workflow_dir, ignore_errors=True)
+                    raise
             
-            # Create __init__.py
-            with open(os.path.join(workflow_dir, "__init__.py"), "w") as f:
-                f.write(f"# Workflow: {name}\n")
+                # Create __init__.py
+                with open(os.path.join(workflow_dir, "__init__.py"), "w") as f:
+                    f.write(f"# Workflow: {name}\n")
             
-            # Create metadata.json
-            metadata = {
-                "workflow_id": workflow_id,
-                "name": name,
-                "created_at": datetime.now().isoformat(),
-            }
+                # Create metadata.json
+                metadata = {
+                    "workflow_id": workflow_id,
+                    "name": name,
+                    "created_at": datetime.now().isoformat(),
+                }
             
-            with open(os.path.join(workflow_dir, "metadata.json"), "w") as f:
-                json.dump(metadata, f, indent=2)
+                with open(os.path.join(workflow_dir, "metadata.json"), "w") as f:
+                    json.dump(metadata, f, indent=2)
+                self._metadata_cache[workflow_id] = metadata
             
-            # Load the workflow
-            return self.load_workflow(workflow_id)
+                # Load the workflow
+                return self.load_workflow(workflow_id)
             
-        except Exception as e:
-            logger.error(f"Error registering workflow {workflow_id}: {e}")
-            return False
+            except Exception as e:
+                logger.error(f"Error registering workflow {workflow_id}: {e}")
+                return False
     
     def execute_workflow(self, workflow_id: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -159,9 +230,14 @@ class WorkflowRegistry:
             if not self.load_workflow(workflow_id):
                 raise ValueError(f"Workflow not found: {workflow_id}")
         
+        # The workflow may have been deleted by another thread since loading
+        entry = self.workflows.get(workflow_id)
+        if entry is None:
+            raise ValueError(f"Workflow not found: {workflow_id}")
+        
         try:
             # Call the run_graph function from the workflow module
-            result = self.workflows[workflow_id]["run_func"](inputs)
+            result = entry.run_func(inputs)
             return result
         except Exception as e:
             logger.error(f"Error executing workflow {workflow_id}: {e}")
@@ -174,19 +250,13 @@ class WorkflowRegistry:
         Returns:
             List[Dict[str, Any]]: List of workflow metadata
         """
+        self._ensure_all_loaded()
         workflow_list = []
         
-        for workflow_id in self.workflows:
-            workflow_dir = os.path.join(self.workflows_dir, workflow_id)
-            metadata_path = os.path.join(workflow_dir, "metadata.json")
-            
-            if os.path.exists(metadata_path):
-                try:
-                    with open(metadata_path, "r") as f:
-                        metadata = json.load(f)
-                        workflow_list.append(metadata)
-                except Exception as e:
-                    logger.error(f"Error reading metadata for workflow {workflow_id}: {e}")
+        for workflow_id in list(self.workflows):
+            metadata = self.get_workflow_metadata(workflow_id)
+            if metadata is not None:
+                workflow_list.append(metadata)
             
         return workflow_list
     
@@ -200,18 +270,48 @@ class WorkflowRegistry:
         Returns:
             Optional[Dict[str, Any]]: Workflow metadata or None if not found
         """
-        workflow_dir = os.path.join(self.workflows_dir, workflow_id)
-        metadata_path = os.path.join(workflow_dir, "metadata.json")
+        metadata = self._metadata_cache.get(workflow_id)
+        if metadata is None:
+            with self._lock:
+                metadata = self._cache_metadata(workflow_id)
+        
+        # Hand out a copy so callers cannot mutate the cached entry
+        return dict(metadata) if metadata is not None else None
+
+    def _cache_metadata(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a workflow's metadata.json once and keep it in memory.
+        
+        Args:
+            workflow_id: ID of the workflow
+            
+        Returns:
+            Optional[Dict[str, Any]]: Cached metadata or None if not found
+        """
+        metadata_path = os.path.join(self.workflows_dir, workflow_id, "metadata.json")
         
         if os.path.exists(metadata_path):
             try:
                 with open(metadata_path, "r") as f:
-                    return json.load(f)
+                    metadata = json.load(f)
+                self._metadata_cache[workflow_id] = metadata
+                return metadata
             except Exception as e:
                 logger.error(f"Error reading metadata for workflow {workflow_id}: {e}")
         
         return None
         
+    def _forget_workflow(self, workflow_id: str) -> None:
+        """
+        Drop a workflow from the registry and its in-memory caches.
+        
+        Args:
+            workflow_id: ID of the workflow
+        """
+        self.workflows.pop(workflow_id, None)
+        self._metadata_cache.pop(workflow_id, None)
+        self._module_cache.pop(workflow_id, None)
+        
     def delete_workflow(self, workflow_id: str) -> bool:
         """
         Delete a workflow.
@@ -222,27 +322,26 @@ class WorkflowRegistry:
         Returns:
             bool: True if workflow was deleted successfully
         """
-        try:
-            workflow_dir = os.path.join(self.workflows_dir, workflow_id)
+        with self._lock:
+            try:
+                workflow_dir = os.path.join(self.workflows_dir, workflow_id)
             
-            if not os.path.exists(workflow_dir):
-                logger.warning(f"Workflow directory does not exist: {workflow_dir}")
-                return False
+                if not os.path.exists(workflow_dir):
+                    logger.warning(f"Workflow directory does not exist: {workflow_dir}")
+                    return False
             
-            # Remove workflow from registry
-            if workflow_id in self.workflows:
-                del self.workflows[workflow_id]
+                # Remove workflow from registry
+                self._forget_workflow(workflow_id)
             
-            # Delete workflow files
-            import shutil
-            shutil.rmtree(workflow_dir)
+                # Delete workflow files
+                shutil.rmtree(workflow_dir)
             
-            logger.info(f"Successfully deleted workflow: {workflow_id}")
-            return True
+                logger.info(f"Successfully deleted workflow: {workflow_id}")
+                return True
             
-        except Exception as e:
-            logger.error(f"Error deleting workflow {workflow_id}: {e}")
-            return False
+            except Exception as e:
+                logger.error(f"Error deleting workflow {workflow_id}: {e}")
+                return False
 
 
 # Create singleton instance
@@ -0,0 +1,248 @@
+"""
+Tests for the workflow registry service.
+"""
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+MAIN_PY = "def run_graph(inputs):\n    return {\"echo\": inputs}\n"
+
+
+@pytest.fixture
+def registry_cls(tmp_path, monkeypatch):
+    """
+    Import the registry with the working directory set to a temp dir, so the
+    module-level singleton does not create a workflows directory in the repo.
+    """
+    monkeypatch.chdir(tmp_path)
+    from app.services.workflow_service import WorkflowRegistry
+    return WorkflowRegistry
+
+
+@pytest.fixture
+def workflows_dir(tmp_path):
+    return str(tmp_path / "workflows")
+
+
+@pytest.fixture
+def registry(registry_cls, workflows_dir):
+    return registry_cls(workflows_dir)
+
+
+def test_metadata_served_for_workflow_not_loaded_in_this_instance(registry_cls, workflows_dir):
+    """
+    Test metadata is read from disk by a registry that has not loaded the workflow.
+    """
+    assert registry_cls(workflows_dir).register_workflow("a", "A", {"main.py": MAIN_PY})
+
+    other = registry_cls(workflows_dir)
+    metadata = other.get_workflow_metadata("a")
+    assert metadata["workflow_id"] == "a"
+    assert metadata["name"] == "A"
+    assert other.get_workflow_metadata("missing") is None
+
+
+def test_metadata_results_are_copies(registry):
+    """
+    Test mutating returned metadata does not change the cached entry.
+    """
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+
+    registry.get_workflow_metadata("a")["name"] = "changed"
+    registry.get_all_workflows()[0]["name"] = "changed"
+
+    assert registry.get_workflow_metadata("a")["name"] == "A"
+    assert registry.get_all_workflows()[0]["name"] == "A"
+
+
+def test_repeat_load_reuses_module(registry):
+    """
+    Test loading an unchanged workflow again reuses the executed module.
+    """
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+    module = registry.workflows["a"].module
+
+    assert registry.load_workflow("a")
+    assert registry.workflows["a"].module is module
+
+
+def test_reregister_runs_new_code(registry):
+    """
+    Test re-registering a workflow with new code executes the new code.
+    """
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+    assert registry.register_workflow(
+        "a", "A", {"main.py": "def run_graph(inputs):\n    return {\"version\": 2}\n"}
+    )
+
+    assert registry.execute_workflow("a", {}) == {"version": 2}
+
+
+def test_changed_source_with_same_mtime_is_reloaded(registry, workflows_dir):
+    """
+    Test main.py replaced with its mtime preserved is still re-executed.
+    """
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+    main_py = os.path.join(workflows_dir, "a", "main.py")
+    stat = os.stat(main_py)
+    with open(main_py, "w") as f:
+        f.write("def run_graph(inputs):\n    return {\"version\": 2}\n")
+    os.utime(main_py, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert registry.load_workflow("a")
+    assert registry.execute_workflow("a", {}) == {"version": 2}
+
+
+def test_delete_clears_caches(registry):
+    """
+    Test deleting a workflow drops it from the registry and its caches.
+    """
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+    assert registry.delete_workflow("a")
+
+    assert "a" not in registry.workflows
+    assert "a" not in registry._module_cache
+    assert "a" not in registry._metadata_cache
+    assert registry.get_workflow_metadata("a") is None
+    assert registry.get_all_workflows() == []
+
+
+def test_metadata_served_after_reregistration(registry):
+    """
+    Test metadata reflects the latest registration of a workflow.
+    """
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+    assert registry.delete_workflow("a")
+    assert registry.register_workflow("a", "Renamed", {"main.py": MAIN_PY})
+
+    assert registry.get_workflow_metadata("a")["name"] == "Renamed"
+    assert [w["name"] for w in registry.get_all_workflows()] == ["Renamed"]
+
+
+def test_syntax_error_fails_registration_and_cleans_up(registry, workflows_dir):
+    """
+    Test a main.py that does not compile is rejected without leaving files behind.
+    """
+    assert not registry.register_workflow("a", "A", {"main.py": "def run_graph(:\n"})
+
+    assert not os.path.exists(os.path.join(workflows_dir, "a"))
+    assert registry.get_workflow_metadata("a") is None
+
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+
+
+def test_syntax_error_on_reregistration_keeps_existing_workflow(registry, workflows_dir):
+    """
+    Test a bad update to a loaded workflow leaves the previous version in place.
+    """
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+
+    assert not registry.register_workflow("a", "A", {"main.py": "def run_graph(:\n"})
+
+    assert registry.execute_workflow("a", {"x": 1}) == {"echo": {"x": 1}}
+    assert registry.get_workflow_metadata("a")["name"] == "A"
+    with open(os.path.join(workflows_dir, "a", "main.py")) as f:
+        assert f.read() == MAIN_PY
+
+
+def test_missing_main_py_fails_registration_and_cleans_up(registry, workflows_dir):
+    """
+    Test a new workflow without main.py is rejected without leaving files behind.
+    """
+    assert not registry.register_workflow("a", "A", {"helpers.py": "X = 1\n"})
+
+    assert not os.path.exists(os.path.join(workflows_dir, "a"))
+
+
+def test_listing_loads_workflows_on_demand(registry_cls, workflows_dir):
+    """
+    Test a fresh registry lists workflows on disk before any preload has run.
+    """
+    assert registry_cls(workflows_dir).register_workflow("a", "A", {"main.py": MAIN_PY})
+
+    assert [w["workflow_id"] for w in registry_cls(workflows_dir).get_all_workflows()] == ["a"]
+
+
+def test_delete_during_preload_does_not_leave_workflow_loaded(registry_cls, workflows_dir):
+    """
+    Test a workflow deleted while the background preload runs stays deleted.
+    """
+    slow_main = "import time\ntime.sleep(0.2)\n" + MAIN_PY
+    assert registry_cls(workflows_dir).register_workflow("a", "A", {"main.py": slow_main})
+
+    registry = registry_cls(workflows_dir)
+    preload = threading.Thread(target=registry.load_all_workflows)
+    preload.start()
+    time.sleep(0.05)
+    assert registry.delete_workflow("a")
+    preload.join()
+
+    assert "a" not in registry.workflows
+    with pytest.raises(ValueError):
+        registry.execute_workflow("a", {})
+
+
+def test_execute_workflow_calls_run_graph(registry):
+    """
+    Test executing a workflow calls its run_graph entry point.
+    """
+    from app.services.workflow_service import WorkflowEntry
+
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+
+    entry = registry.workflows["a"]
+    assert isinstance(entry, WorkflowEntry)
+    assert isinstance(entry.loaded_at, int)
+    assert registry.execute_workflow("a", {"x": 1}) == {"echo": {"x": 1}}
+
+
+def test_execute_workflow_errors(registry):
+    """
+    Test unknown workflows and failing run_graph calls raise ValueError.
+    """
+    failing_main = "def run_graph(inputs):\n    raise RuntimeError(\"boom\")\n"
+    assert registry.register_workflow("a", "A", {"main.py": failing_main})
+
+    with pytest.raises(ValueError, match="boom"):
+        registry.execute_workflow("a", {})
+    with pytest.raises(ValueError, match="Workflow not found"):
+        registry.execute_workflow("missing", {})
+
+
+def test_register_after_directory_removed_externally(registry, workflows_dir):
+    """
+    Test registration recreates a workflow directory removed outside the registry.
+    """
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+    shutil.rmtree(os.path.join(workflows_dir, "a"))
+
+    assert registry.register_workflow("a", "A", {"main.py": MAIN_PY})
+    assert os.path.exists(os.path.join(workflows_dir, "a", "main.py"))
+
+
+def test_register_during_preload_is_not_blocked(registry_cls, workflows_dir):
+    """
+    Test registering a workflow does not wait for the whole preload to finish.
+    """
+    slow_main = "import time\ntime.sleep(0.2)\n" + MAIN_PY
+    setup = registry_cls(workflows_dir)
+    for workflow_id in ("a", "b", "c"):
+        assert setup.register_workflow(workflow_id, workflow_id, {"main.py": slow_main})
+
+    registry = registry_cls(workflows_dir)
+    preload = threading.Thread(target=registry.load_all_workflows)
+    preload.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert registry.register_workflow("d", "D", {"main.py": MAIN_PY})
+    elapsed = time.monotonic() - started
+    # Listing waits for the in-progress preload rather than returning a partial list
+    listed = sorted(w["workflow_id"] for w in registry.get_all_workflows())
+    preload.join()
+
+    # At most one slow workflow load can be in progress ahead of the register
+    assert elapsed < 0.4
+    assert listed == ["a", "b", "c", "d"]